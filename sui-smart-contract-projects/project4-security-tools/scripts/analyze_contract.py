@@ -6,254 +6,554 @@ Performs static analysis on Sui Move smart contracts to identify
 common security vulnerabilities and code quality issues.
 """
 
-import re
+import mmap
+import os
 import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
-from enum import Enum
-
-
-class Severity(Enum):
-    CRITICAL = "🔴 CRITICAL"
-    HIGH = "🟠 HIGH"
-    MEDIUM = "🟡 MEDIUM"
-    LOW = "🟢 LOW"
-    INFO = "ℹ️  INFO"
-
-
-@dataclass
-class Finding:
-    severity: Severity
-    title: str
-    description: str
+from typing import Any, Iterator, List, Dict, NamedTuple, Optional, Tuple, Union
+from enum import Enum, IntEnum
+from operator import attrgetter
+
+try:
+    import regex as re
+except ImportError:
+    import re
+
+if re.__name__ == 're' and sys.version_info < (3, 11):
+    # The stdlib engine only understands possessive quantifiers from Python 3.11.
+    # Ours never change what matches, so older versions compile them as greedy.
+    _PAT_POSSESSIVE = re.compile(rb'(?<=[+*?])\+')
+
+    def _compile(pattern: bytes) -> re.Pattern:
+        return re.compile(_PAT_POSSESSIVE.sub(b'', pattern))
+else:
+    _compile = re.compile
+
+
+class Severity(IntEnum):
+    # Values are the report order, so severities sort by plain integer comparison
+    CRITICAL = 0
+    HIGH = 1
+    MEDIUM = 2
+    LOW = 3
+    INFO = 4
+
+
+_SEV_LABEL = (
+    "🔴 CRITICAL",
+    "🟠 HIGH",
+    "🟡 MEDIUM",
+    "🟢 LOW",
+    "ℹ️  INFO",
+)
+
+
+class Rule(Enum):
+    """A kind of finding: its severity and the wording shared by every instance"""
+    HARDCODED_ADDRESS = (
+        Severity.HIGH,
+        "Hardcoded Address Authorization",
+        "Using hardcoded addresses for authorization is insecure",
+        "Use capability-based access control with Cap objects",
+    )
+    ADMIN_WITHOUT_CAP = (
+        Severity.CRITICAL,
+        "Missing Access Control on Admin Function",
+        "Admin function '{}' lacks capability check",
+        "Add AdminCap or similar capability parameter",
+    )
+    DIVISION_BY_ZERO = (
+        Severity.MEDIUM,
+        "Potential Division by Zero",
+        "Division by '{}' without visible zero check",
+        "Add assertion: assert!(divisor != 0, ERROR_CODE)",
+    )
+    PRECISION_LOSS = (
+        Severity.LOW,
+        "Potential Precision Loss",
+        "Division before multiplication can cause precision loss",
+        "Perform multiplication before division: (a * c) / b",
+    )
+    UNCHECKED_BALANCE_SPLIT = (
+        Severity.HIGH,
+        "Unchecked Balance Split",
+        "balance::split called without verifying sufficient balance",
+        "Check balance before split: assert!(balance::value(&balance) >= amount, ...)",
+    )
+    MISSING_TESTS = (
+        Severity.MEDIUM,
+        "Missing Test Coverage",
+        "Module has {} public functions but no tests",
+        "Add comprehensive unit tests for all public functions",
+    )
+    MISSING_EVENT = (
+        Severity.LOW,
+        "Missing Event Emission",
+        "State change ({}) without event emission",
+        "Emit event after state changes for off-chain tracking",
+    )
+    UNBOUNDED_LOOP = (
+        Severity.MEDIUM,
+        "Potentially Unbounded Loop",
+        "Loop without visible maximum iteration limit",
+        "Add maximum iteration limit or use batch processing",
+    )
+    INCONSISTENT_PRECISION = (
+        Severity.MEDIUM,
+        "Inconsistent Precision Constants",
+        "Multiple precision constants found: {}",
+        "Use a single, consistent precision constant throughout",
+    )
+
+    def __init__(self, severity: Severity, title: str, description: str, recommendation: str):
+        self.severity = severity
+        self.title = title
+        self.description = description
+        self.recommendation = recommendation
+
+
+class Finding(NamedTuple):
+    rule: Rule
     file: str
     line: int
     code_snippet: str
-    recommendation: str
+    detail: Any = None
+
+    @property
+    def severity(self) -> Severity:
+        return self.rule.severity
+
+    @property
+    def title(self) -> str:
+        return self.rule.title
+
+    @property
+    def description(self) -> str:
+        # Formatted on demand, so findings only carry the detail that varies
+        return self.rule.description.format(self.detail)
+
+    @property
+    def recommendation(self) -> str:
+        return self.rule.recommendation
+
+
+# File contents are scanned as bytes; large files are memory-mapped instead of read
+Content = Union[bytes, mmap.mmap]
+
+_MMAP_THRESHOLD = 1 << 20
+
+# Files are handed to worker processes in batches; each worker reads the rest
+# of its batch on a few threads while it analyzes the current file
+_BATCH_SIZE = 8
+_PREFETCH_THREADS = 4
+
+# Patterns are compiled once at import rather than on every check of every file.
+# Quantifiers followed by a disjoint token are possessive so a failed match
+# gives up immediately instead of backtracking through every split point.
+_PAT_HARDCODED_ADDR = _compile(rb'ctx\.sender\(\)\s*+==\s*+@0x[a-fA-F0-9]++')
+_PAT_PUBLIC_ENTRY = _compile(rb'public\s++entry\s++fun\s++(\w++)\s*+<[^>]*+>\s*+\([^)]*+\)\s*+\{')
+
+# A comment or string literal. Code-only patterns try one first at every
+# position and consume it whole, so they are never matched inside one, and
+# between tokens they skip them like whitespace. A '/' starting a comment is
+# therefore not a division. Each alternative can end in only one place, so
+# they match the same when the possessive quantifiers are compiled as greedy.
+# A match never starts inside a word, and the leading \b saves attempting one
+# at every byte of it.
+_SKIPPED = rb'"(?:\\.|[^"\\])*+"|/\*[^*]*+(?:\*(?!/)[^*]*+)*+\*/|//[^\n]*+(?![^\n])'
+_CODE_GAP = rb'(?:\s|' + _SKIPPED + rb')*+'
+_CODE_DIV = _CODE_GAP + rb'/(?![/*])' + _CODE_GAP
+
+_PAT_DIVISION = _compile(_SKIPPED + rb'|\b(\w++)' + _CODE_DIV + rb'(\w++)')
+_PAT_DIV_MUL = _compile(_SKIPPED + rb'|\b(\w++)' + _CODE_DIV + rb'(\w++)' + _CODE_GAP + rb'\*' + _CODE_GAP + rb'(\w++)')
+_PAT_BALANCE_SPLIT = _compile(rb'balance::split\(&mut\s++[\w.]++,\s*+(\w++)\)')
+_PAT_PUBLIC_FUN = _compile(rb'public\s++(entry\s++)?fun\s++\w++')
+_PAT_STATE_CHANGES = _compile(rb'balance::join|balance::split|transfer::(?:public_)?transfer')
+_PAT_WHILE = _compile(rb'while\s*+\([^)]++\)\s*+\{')
+_PAT_PRECISION_CONST = _compile(rb'const\s++\w*PRECISION\w*+:\s*+u64\s*+=\s*+(\d++)')
+_PAT_NEWLINE = _compile(rb'\n')
+_PAT_BRACE = _compile(rb'[{}]')
+_PAT_SKIPPED = _compile(_SKIPPED)
+
+# Every pattern the checks consume, by name. Matches are shared through a
+# per-file index, so each pattern scans a file at most once whichever checks
+# use it.
+_SCAN_PATTERNS: Dict[str, re.Pattern] = {
+    'hardcoded_addr': _PAT_HARDCODED_ADDR,
+    'public_entry': _PAT_PUBLIC_ENTRY,
+    'division': _PAT_DIVISION,
+    'div_mul': _PAT_DIV_MUL,
+    'balance_split': _PAT_BALANCE_SPLIT,
+    'public_fun': _PAT_PUBLIC_FUN,
+    'state_changes': _PAT_STATE_CHANGES,
+    'while': _PAT_WHILE,
+    'precision_const': _PAT_PRECISION_CONST,
+}
+
+# Patterns matched against code only; matches of a skipped span are dropped
+_CODE_PATTERNS = frozenset({'division', 'div_mul'})
+
+# Literals at least one of which every match of a pattern contains. A plain
+# substring search skips patterns whose literals are absent, which is the
+# common case for most modules.
+_SCAN_ANCHORS: Dict[str, Tuple[bytes, ...]] = {
+    'hardcoded_addr': (b'ctx.sender()',),
+    'balance_split': (b'balance::split',),
+    'state_changes': (b'balance::', b'transfer::'),
+    'while': (b'while',),
+    'precision_const': (b'PRECISION',),
+}
+
+
+def _skipped_spans(content: Content) -> Tuple[List[int], List[int]]:
+    """Return the start and end offsets of every comment and string literal in content"""
+    starts: List[int] = []
+    ends: List[int] = []
+    for match in _PAT_SKIPPED.finditer(content):
+        starts.append(match.start())
+        ends.append(match.end())
+    return starts, ends
+
+
+class _MatchIndex(dict):
+    """Matches of each scan pattern in one file, computed the first time a check asks"""
+
+    def __init__(self, content: Content):
+        super().__init__()
+        self.content = content
+        self._spans: Optional[Tuple[List[int], List[int]]] = None
+
+    @property
+    def spans(self) -> Tuple[List[int], List[int]]:
+        """Start and end offsets of the comments and string literals in the content"""
+        if self._spans is None:
+            self._spans = _skipped_spans(self.content)
+        return self._spans
+
+    def __missing__(self, name: str) -> List[re.Match]:
+        anchors = _SCAN_ANCHORS.get(name, ())
+        if anchors and all(self.content.find(anchor) == -1 for anchor in anchors):
+            matches = []
+        else:
+            found = _SCAN_PATTERNS[name].finditer(self.content)
+            if name in _CODE_PATTERNS:
+                # A match without groups is a comment or string literal skipped whole
+                matches = [match for match in found if match.lastindex]
+            else:
+                matches = list(found)
+        self[name] = matches
+        return matches
+
+
+def _scan_all(content: Content) -> _MatchIndex:
+    """Index the matches of every scan pattern in content by pattern name"""
+    return _MatchIndex(content)
+
+
+def _iter_move(root: str) -> Iterator[str]:
+    """Yield the path of every .move file under root, in the order and form rglob gives"""
+    # scandir exposes the entry type from the directory listing itself, so
+    # no extra stat call is needed per entry. Paths are joined as pathlib
+    # joins them, so a root of '.' gives 'a.move' rather than './a.move'.
+    stack = ['' if root == os.curdir else root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory or os.curdir)
+        except (PermissionError, NotADirectoryError):
+            # Skip what rglob skipped: unreadable directories, or a file as root
+            continue
+        subdirs = []
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(os.path.join(directory, entry.name))
+                elif entry.name.endswith('.move'):
+                    yield os.path.join(directory, entry.name)
+        # Descend depth first in listing order, as rglob does
+        stack.extend(reversed(subdirs))
+
+
+def _line_starts(content: Content) -> List[int]:
+    """Return the sorted line start offsets; bisect_right over them gives 1-based line numbers"""
+    return [0] + [match.end() for match in _PAT_NEWLINE.finditer(content)]
+
+
+def _line_end(line_starts: List[int], line: int, size: int) -> int:
+    """Return the offset of the newline ending a 1-based line, or size past the last line"""
+    return line_starts[line] - 1 if line < len(line_starts) else size
+
+
+def _snippet(content: Content, line_starts: List[int], line: int) -> str:
+    """Decode a 1-based line for display in a finding"""
+    text = content[line_starts[line - 1]:_line_end(line_starts, line, len(content))]
+    return text.strip().decode('utf-8', 'replace')
+
+
+def _end_of_block(buf: Content, start: int, spans: Tuple[List[int], List[int]]) -> int:
+    """Return the offset of the '}' closing the block opened just before start"""
+    span_starts, span_ends = spans
+    depth = 1
+    # Jump from brace to brace instead of stepping through every byte
+    for match in _PAT_BRACE.finditer(buf, start):
+        pos = match.start()
+        # Braces inside comments and string literals don't count
+        i = bisect_right(span_starts, pos) - 1
+        if i >= 0 and pos < span_ends[i]:
+            continue
+        if match.group() == b'{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.start()
+    return len(buf)
 
 
 class SuiMoveAnalyzer:
     def __init__(self, source_dir: Path):
         self.source_dir = source_dir
         self.findings: List[Finding] = []
+        self._block_ends: Dict[int, int] = {}
 
     def analyze(self) -> List[Finding]:
         """Run all security checks"""
         print(f"🔍 Analyzing contracts in: {self.source_dir}")
 
-        move_files = list(self.source_dir.rglob("*.move"))
+        move_files = list(_iter_move(str(self.source_dir)))
         print(f"📁 Found {len(move_files)} Move files\n")
 
-        for file_path in move_files:
-            self.analyze_file(file_path)
+        # Files are independent, so spread them across worker processes
+        batches = [move_files[i:i + _BATCH_SIZE] for i in range(0, len(move_files), _BATCH_SIZE)]
+        with ProcessPoolExecutor() as executor:
+            for batch, results in zip(batches, executor.map(_analyze_batch, batches)):
+                for file_path, findings in zip(batch, results):
+                    print(f"Analyzing: {os.path.basename(file_path)}")
+                    self.findings.extend(findings)
 
         return self.findings
 
-    def analyze_file(self, file_path: Path):
-        """Analyze a single Move file"""
-        print(f"Analyzing: {file_path.name}")
-
-        with open(file_path, 'r') as f:
-            content = f.read()
-            lines = content.split('\n')
-
-        self.check_access_control(file_path, content, lines)
-        self.check_arithmetic_safety(file_path, content, lines)
-        self.check_asset_handling(file_path, content, lines)
-        self.check_test_coverage(file_path, content, lines)
-        self.check_event_emissions(file_path, content, lines)
-        self.check_dos_vectors(file_path, content, lines)
-        self.check_precision_issues(file_path, content, lines)
-
-    def check_access_control(self, file_path: Path, content: str, lines: List[str]):
+    def analyze_file(self, file_path: str, data: Optional[bytes] = None) -> List[Finding]:
+        """Analyze a single Move file, or its already-read data, and return its findings"""
+        first = len(self.findings)
+        self._block_ends.clear()
+
+        if data is not None:
+            content = data
+        else:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size >= _MMAP_THRESHOLD:
+                    content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    content = f.read()
+
+        try:
+            line_starts = _line_starts(content)
+            matches = _scan_all(content)
+
+            file = str(file_path)
+            self.check_access_control(file, content, line_starts, matches)
+            self.check_arithmetic_safety(file, content, line_starts, matches)
+            self.check_asset_handling(file, content, line_starts, matches)
+            self.check_test_coverage(file, content, line_starts, matches)
+            self.check_event_emissions(file, content, line_starts, matches)
+            self.check_dos_vectors(file, content, line_starts, matches)
+            self.check_precision_issues(file, content, line_starts, matches)
+        finally:
+            if isinstance(content, mmap.mmap):
+                content.close()
+
+        return self.findings[first:]
+
+    def _block_end(self, content: Content, start: int, spans: Tuple[List[int], List[int]]) -> int:
+        """Return the end of the block opened just before start, cached per file"""
+        end = self._block_ends.get(start)
+        if end is None:
+            end = self._block_ends[start] = _end_of_block(content, start, spans)
+        return end
+
+    def check_access_control(self, file_path: str, content: Content, line_starts: List[int], matches: _MatchIndex):
         """Check for access control issues"""
+        append = self.findings.append
+        find = content.find
 
         # Check for hardcoded addresses
-        pattern = r'ctx\.sender\(\)\s*==\s*@0x[a-fA-F0-9]+'
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            line_num = content[:match.start()].count('\n') + 1
-            self.findings.append(Finding(
-                severity=Severity.HIGH,
-                title="Hardcoded Address Authorization",
-                description="Using hardcoded addresses for authorization is insecure",
-                file=str(file_path),
+        rule = Rule.HARDCODED_ADDRESS
+        for match in matches['hardcoded_addr']:
+            line_num = bisect_right(line_starts, match.start())
+            append(Finding(
+                rule=rule,
+                file=file_path,
                 line=line_num,
-                code_snippet=lines[line_num - 1].strip(),
-                recommendation="Use capability-based access control with Cap objects"
+                code_snippet=_snippet(content, line_starts, line_num)
             ))
 
         # Check for public entry functions without checks
-        pattern = r'public\s+entry\s+fun\s+(\w+)\s*<[^>]*>\s*\([^)]*\)\s*\{'
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            func_name = match.group(1)
-            if any(keyword in func_name.lower() for keyword in ['admin', 'owner', 'pause', 'update', 'set']):
+        rule = Rule.ADMIN_WITHOUT_CAP
+        admin_keywords = ('admin', 'owner', 'pause', 'update', 'set')
+        for match in matches['public_entry']:
+            func_name = match.group(1).decode()
+            lowered = func_name.lower()
+            if any(keyword in lowered for keyword in admin_keywords):
                 # Check if function has capability parameter
                 func_start = match.start()
-                func_end = content.find('}', func_start)
-                func_body = content[func_start:func_end]
-
-                if 'Cap' not in func_body or '_cap' not in func_body.lower():
-                    line_num = content[:match.start()].count('\n') + 1
-                    self.findings.append(Finding(
-                        severity=Severity.CRITICAL,
-                        title="Missing Access Control on Admin Function",
-                        description=f"Admin function '{func_name}' lacks capability check",
-                        file=str(file_path),
+                func_end = self._block_end(content, match.end(), matches.spans)
+
+                if find(b'Cap', func_start, func_end) == -1 or b'_cap' not in content[func_start:func_end].lower():
+                    line_num = bisect_right(line_starts, func_start)
+                    append(Finding(
+                        rule=rule,
+                        file=file_path,
                         line=line_num,
-                        code_snippet=lines[line_num - 1].strip(),
-                        recommendation="Add AdminCap or similar capability parameter"
+                        code_snippet=_snippet(content, line_starts, line_num),
+                        detail=func_name
                     ))
 
-    def check_arithmetic_safety(self, file_path: Path, content: str, lines: List[str]):
+    def check_arithmetic_safety(self, file_path: str, content: Content, line_starts: List[int], matches: _MatchIndex):
         """Check for arithmetic safety issues"""
+        append = self.findings.append
+        find = content.find
+        size = len(content)
 
         # Check for divisions
-        pattern = r'(\w+)\s*/\s*(\w+)'
-        matches = re.finditer(pattern, content)
-        for match in matches:
+        rule = Rule.DIVISION_BY_ZERO
+        for match in matches['division']:
             divisor = match.group(2)
-            line_num = content[:match.start()].count('\n') + 1
+            line_num = bisect_right(line_starts, match.start())
 
             # Look for zero check in surrounding lines
-            surrounding = '\n'.join(lines[max(0, line_num-3):min(len(lines), line_num+3)])
-            if f'assert!({divisor}' not in surrounding and f'{divisor} >' not in surrounding and f'{divisor} !=' not in surrounding:
-                self.findings.append(Finding(
-                    severity=Severity.MEDIUM,
-                    title="Potential Division by Zero",
-                    description=f"Division by '{divisor}' without visible zero check",
-                    file=str(file_path),
+            win_start = line_starts[max(0, line_num-3)]
+            win_end = _line_end(line_starts, line_num+3, size)
+            if (find(b'assert!(' + divisor, win_start, win_end) == -1
+                    and find(divisor + b' >', win_start, win_end) == -1
+                    and find(divisor + b' !=', win_start, win_end) == -1):
+                append(Finding(
+                    rule=rule,
+                    file=file_path,
                     line=line_num,
-                    code_snippet=lines[line_num - 1].strip(),
-                    recommendation="Add assertion: assert!(divisor != 0, ERROR_CODE)"
+                    code_snippet=_snippet(content, line_starts, line_num),
+                    detail=divisor.decode()
                 ))
 
         # Check for multiplication order (precision)
-        pattern = r'(\w+)\s*/\s*(\w+)\s*\*\s*(\w+)'
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            line_num = content[:match.start()].count('\n') + 1
-            self.findings.append(Finding(
-                severity=Severity.LOW,
-                title="Potential Precision Loss",
-                description="Division before multiplication can cause precision loss",
-                file=str(file_path),
+        rule = Rule.PRECISION_LOSS
+        for match in matches['div_mul']:
+            line_num = bisect_right(line_starts, match.start())
+            append(Finding(
+                rule=rule,
+                file=file_path,
                 line=line_num,
-                code_snippet=lines[line_num - 1].strip(),
-                recommendation="Perform multiplication before division: (a * c) / b"
+                code_snippet=_snippet(content, line_starts, line_num)
             ))
 
-    def check_asset_handling(self, file_path: Path, content: str, lines: List[str]):
+    def check_asset_handling(self, file_path: str, content: Content, line_starts: List[int], matches: _MatchIndex):
         """Check for asset handling issues"""
+        append = self.findings.append
+        find = content.find
+        size = len(content)
 
         # Check for balance operations without value checks
-        pattern = r'balance::split\(&mut\s+[\w.]+,\s*(\w+)\)'
-        matches = re.finditer(pattern, content)
-        for match in matches:
+        rule = Rule.UNCHECKED_BALANCE_SPLIT
+        for match in matches['balance_split']:
             amount_var = match.group(1)
-            line_num = content[:match.start()].count('\n') + 1
+            line_num = bisect_right(line_starts, match.start())
 
             # Look for balance check before split
-            preceding = '\n'.join(lines[max(0, line_num-5):line_num])
-            if 'balance::value' not in preceding and amount_var not in preceding:
-                self.findings.append(Finding(
-                    severity=Severity.HIGH,
-                    title="Unchecked Balance Split",
-                    description=f"balance::split called without verifying sufficient balance",
-                    file=str(file_path),
+            win_start = line_starts[max(0, line_num-5)]
+            win_end = _line_end(line_starts, line_num, size)
+            if find(b'balance::value', win_start, win_end) == -1 and find(amount_var, win_start, win_end) == -1:
+                append(Finding(
+                    rule=rule,
+                    file=file_path,
                     line=line_num,
-                    code_snippet=lines[line_num - 1].strip(),
-                    recommendation="Check balance before split: assert!(balance::value(&balance) >= amount, ...)"
+                    code_snippet=_snippet(content, line_starts, line_num)
                 ))
 
-    def check_test_coverage(self, file_path: Path, content: str, lines: List[str]):
+    def check_test_coverage(self, file_path: str, content: Content, line_starts: List[int], matches: _MatchIndex):
         """Check for test coverage"""
 
-        # Count public functions
-        public_funcs = len(re.findall(r'public\s+(entry\s+)?fun\s+\w+', content))
+        # Look for tests with plain substring searches; only their absence matters
+        if content.find(b'#[test]') != -1 or content.find(b'#[test_only]') != -1:
+            return
 
-        # Count test functions
-        test_funcs = len(re.findall(r'#\[test\]', content))
+        # Count public functions
+        public_funcs = len(matches['public_fun'])
 
-        if public_funcs > 0 and test_funcs == 0 and '#[test_only]' not in content:
+        if public_funcs > 0:
             self.findings.append(Finding(
-                severity=Severity.MEDIUM,
-                title="Missing Test Coverage",
-                description=f"Module has {public_funcs} public functions but no tests",
-                file=str(file_path),
+                rule=Rule.MISSING_TESTS,
+                file=file_path,
                 line=1,
                 code_snippet="",
-                recommendation="Add comprehensive unit tests for all public functions"
+                detail=public_funcs
             ))
 
-    def check_event_emissions(self, file_path: Path, content: str, lines: List[str]):
+    def check_event_emissions(self, file_path: str, content: Content, line_starts: List[int], matches: _MatchIndex):
         """Check for event emissions on state changes"""
+        append = self.findings.append
+        find = content.find
+        size = len(content)
+        rule = Rule.MISSING_EVENT
+
+        # Find state-changing patterns in a single pass
+        reported = set()
+        for match in matches['state_changes']:
+            state_change = match.group().decode()
+            if state_change in reported:
+                continue
+            line_num = bisect_right(line_starts, match.start())
+
+            # Check if event::emit is nearby
+            win_start = line_starts[max(0, line_num-2)]
+            win_end = _line_end(line_starts, line_num+3, size)
+            if find(b'event::emit', win_start, win_end) == -1:
+                append(Finding(
+                    rule=rule,
+                    file=file_path,
+                    line=line_num,
+                    code_snippet=_snippet(content, line_starts, line_num),
+                    detail=state_change
+                ))
+                reported.add(state_change)  # Only report once per state change kind
 
-        # Find state-changing patterns
-        patterns = [
-            r'balance::join',
-            r'balance::split',
-            r'transfer::transfer',
-            r'transfer::public_transfer'
-        ]
-
-        for pattern in patterns:
-            matches = re.finditer(pattern, content)
-            for match in matches:
-                line_num = content[:match.start()].count('\n') + 1
-
-                # Check if event::emit is nearby
-                surrounding = '\n'.join(lines[max(0, line_num-2):min(len(lines), line_num+3)])
-                if 'event::emit' not in surrounding:
-                    self.findings.append(Finding(
-                        severity=Severity.LOW,
-                        title="Missing Event Emission",
-                        description=f"State change ({match.group()}) without event emission",
-                        file=str(file_path),
-                        line=line_num,
-                        code_snippet=lines[line_num - 1].strip(),
-                        recommendation="Emit event after state changes for off-chain tracking"
-                    ))
-                    break  # Only report once per function
-
-    def check_dos_vectors(self, file_path: Path, content: str, lines: List[str]):
+    def check_dos_vectors(self, file_path: str, content: Content, line_starts: List[int], matches: _MatchIndex):
         """Check for denial of service vectors"""
+        append = self.findings.append
+        find = content.find
+        size = len(content)
+        rule = Rule.UNBOUNDED_LOOP
 
         # Check for unbounded loops
-        pattern = r'while\s*\([^)]+\)\s*\{'
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            line_num = content[:match.start()].count('\n') + 1
-            loop_content = lines[line_num - 1]
+        for match in matches['while']:
+            loop_start = match.start()
+            line_num = bisect_right(line_starts, loop_start)
+            line_start = line_starts[line_num-1]
+            line_end = _line_end(line_starts, line_num, size)
 
             # Check if there's a length check
-            if 'length' in loop_content and 'MAX' not in content[max(0, match.start()-200):match.start()]:
-                self.findings.append(Finding(
-                    severity=Severity.MEDIUM,
-                    title="Potentially Unbounded Loop",
-                    description="Loop without visible maximum iteration limit",
-                    file=str(file_path),
+            if (find(b'length', line_start, line_end) != -1
+                    and find(b'MAX', max(0, loop_start-200), loop_start) == -1):
+                append(Finding(
+                    rule=rule,
+                    file=file_path,
                     line=line_num,
-                    code_snippet=loop_content.strip(),
-                    recommendation="Add maximum iteration limit or use batch processing"
+                    code_snippet=_snippet(content, line_starts, line_num)
                 ))
 
-    def check_precision_issues(self, file_path: Path, content: str, lines: List[str]):
+    def check_precision_issues(self, file_path: str, content: Content, line_starts: List[int], matches: _MatchIndex):
         """Check for precision-related issues"""
 
         # Check for consistent precision constants
-        precision_constants = re.findall(r'const\s+\w*PRECISION\w*:\s*u64\s*=\s*(\d+)', content)
+        precision_constants = [match.group(1).decode() for match in matches['precision_const']]
         if len(set(precision_constants)) > 1:
             self.findings.append(Finding(
-                severity=Severity.MEDIUM,
-                title="Inconsistent Precision Constants",
-                description=f"Multiple precision constants found: {set(precision_constants)}",
-                file=str(file_path),
+                rule=Rule.INCONSISTENT_PRECISION,
+                file=file_path,
                 line=1,
                 code_snippet="",
-                recommendation="Use a single, consistent precision constant throughout"
+                detail=str(set(precision_constants))
             ))
 
     def generate_report(self) -> str:
@@ -262,54 +562,68 @@ class SuiMoveAnalyzer:
             return "✅ No security issues found! Great work!"
 
         # Sort by severity
-        severity_order = {
-            Severity.CRITICAL: 0,
-            Severity.HIGH: 1,
-            Severity.MEDIUM: 2,
-            Severity.LOW: 3,
-            Severity.INFO: 4
-        }
-        self.findings.sort(key=lambda x: severity_order[x.severity])
+        self.findings.sort(key=attrgetter('severity'))
 
         # Count by severity
         counts = {s: 0 for s in Severity}
         for finding in self.findings:
             counts[finding.severity] += 1
 
-        report = "=" * 80 + "\n"
-        report += "🛡️  SUI MOVE SECURITY ANALYSIS REPORT\n"
-        report += "=" * 80 + "\n\n"
+        parts: List[str] = []
+        parts.append("=" * 80 + "\n")
+        parts.append("🛡️  SUI MOVE SECURITY ANALYSIS REPORT\n")
+        parts.append("=" * 80 + "\n\n")
 
-        report += "📊 SUMMARY\n"
-        report += "-" * 40 + "\n"
+        parts.append("📊 SUMMARY\n")
+        parts.append("-" * 40 + "\n")
         for severity in Severity:
             if counts[severity] > 0:
-                report += f"{severity.value}: {counts[severity]}\n"
-        report += f"\nTotal Issues: {len(self.findings)}\n\n"
+                parts.append(f"{_SEV_LABEL[severity]}: {counts[severity]}\n")
+        parts.append(f"\nTotal Issues: {len(self.findings)}\n\n")
 
-        report += "=" * 80 + "\n"
-        report += "🔍 DETAILED FINDINGS\n"
-        report += "=" * 80 + "\n\n"
+        parts.append("=" * 80 + "\n")
+        parts.append("🔍 DETAILED FINDINGS\n")
+        parts.append("=" * 80 + "\n\n")
 
         for i, finding in enumerate(self.findings, 1):
-            report += f"[{i}] {finding.severity.value} - {finding.title}\n"
-            report += f"File: {finding.file}:{finding.line}\n"
-            report += f"Description: {finding.description}\n"
+            parts.append(f"[{i}] {_SEV_LABEL[finding.severity]} - {finding.title}\n")
+            parts.append(f"File: {finding.file}:{finding.line}\n")
+            parts.append(f"Description: {finding.description}\n")
             if finding.code_snippet:
-                report += f"Code: {finding.code_snippet}\n"
-            report += f"💡 Recommendation: {finding.recommendation}\n"
-            report += "-" * 80 + "\n\n"
+                parts.append(f"Code: {finding.code_snippet}\n")
+            parts.append(f"💡 Recommendation: {finding.recommendation}\n")
+            parts.append("-" * 80 + "\n\n")
+
+        parts.append("=" * 80 + "\n")
+        parts.append("✨ NEXT STEPS\n")
+        parts.append("=" * 80 + "\n")
+        parts.append("1. Review all CRITICAL and HIGH severity findings immediately\n")
+        parts.append("2. Implement recommended fixes\n")
+        parts.append("3. Add comprehensive test coverage\n")
+        parts.append("4. Consider formal verification for critical functions\n")
+        parts.append("5. Schedule external security audit\n\n")
+
+        return "".join(parts)
+
+
+def _read_source(file_path: str) -> Optional[bytes]:
+    """Read a small file ahead of analysis; large files are left to be memory-mapped"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_THRESHOLD:
+            return None
+        return f.read()
+
+
+def _analyze_one(file_path: str, data: Optional[bytes] = None) -> List[Finding]:
+    """Analyze a single file with a throwaway analyzer"""
+    return SuiMoveAnalyzer(Path(os.path.dirname(file_path))).analyze_file(file_path, data)
 
-        report += "=" * 80 + "\n"
-        report += "✨ NEXT STEPS\n"
-        report += "=" * 80 + "\n"
-        report += "1. Review all CRITICAL and HIGH severity findings immediately\n"
-        report += "2. Implement recommended fixes\n"
-        report += "3. Add comprehensive test coverage\n"
-        report += "4. Consider formal verification for critical functions\n"
-        report += "5. Schedule external security audit\n\n"
 
-        return report
+def _analyze_batch(file_paths: List[str]) -> List[List[Finding]]:
+    """Analyze a batch of files, prefetching their contents (process pool entry point)"""
+    with ThreadPoolExecutor(max_workers=_PREFETCH_THREADS) as pool:
+        sources = pool.map(_read_source, file_paths)
+        return [_analyze_one(file_path, data) for file_path, data in zip(file_paths, sources)]
 
 
 def main():
@@ -326,12 +640,13 @@ def main():
     analyzer = SuiMoveAnalyzer(source_dir)
     findings = analyzer.analyze()
 
-    print("\n" + analyzer.generate_report())
+    report = analyzer.generate_report()
+    print("\n" + report)
 
     # Save report to file
     report_path = Path("security_audit_report.txt")
     with open(report_path, 'w') as f:
-        f.write(analyzer.generate_report())
+        f.write(report)
 
     print(f"📄 Full report saved to: {report_path.absolute()}\n")
 